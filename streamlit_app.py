@@ -3,12 +3,13 @@ import pandas as pd
 
 from vhl_pvs1 import classify_vhl_pvs1
 from vhl_ps1 import classify_vhl_ps1
-from vhl_ps2 import classify_vhl_ps2
+from vhl_ps2 import STREAMLIT_GENES, classify_vhl_ps2
 from vhl_pm4 import classify_vhl_pm4
 from vhl_pm1 import classify_vhl_pm1
 from vhl_pm2 import classify_vhl_pm2
 from vhl_ba1 import classify_vhl_ba1
 from vhl_bs1 import classify_vhl_bs1
+from vhl_gnomad import warm_connections
 
 # ---------------- Streamlit page config ----------------
 
@@ -18,6 +19,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# Open the Ensembl/gnomAD connections while the user is still typing.
+warm_connections()
+
 
 # ---------------- CSS for wrapped tables ----------------
 
@@ -230,23 +234,9 @@ PS2 evidence can be assigned, even with confirmed de novo status.
 
         st.markdown("**Mark negative testing results below only if confirmed:**")
 
-        panel_genes = [
-            "SDHB",
-            "SDHC",
-            "SDHD",
-            "RET",
-            "MAX",
-            "FH",
-            "TMEM127",
-            "NF1",
-            "SDHA",
-            "SDHAF2",
-            "VHL",
-        ]
-
         panel_neg = {}
         cols = st.columns(4)
-        for i, gene in enumerate(panel_genes):
+        for i, gene in enumerate(STREAMLIT_GENES):
             with cols[i % 4]:
                 checked = st.checkbox(f"{gene} negative", value=False, key=gene)
                 panel_neg[gene] = "neg" if checked else None
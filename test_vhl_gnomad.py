@@ -0,0 +1,45 @@
+import pytest
+
+from vhl_gnomad import _gnomad_can_report, is_snv_or_small_indel_hgvs
+
+
+@pytest.mark.parametrize(
+    "hgvs",
+    [
+        "chr3:g.10142091_10142093del",
+        "NC_000003.12:g.10142091dup",
+        "3:g.10142091_10142092insA",
+        "chr3:g.10191340A>T",
+        "p.Arg64Pro",
+    ],
+)
+def test_non_cdna_shapes_go_to_vep(hgvs):
+    assert _gnomad_can_report(hgvs)
+
+
+@pytest.mark.parametrize(
+    "cdna, expected",
+    [
+        ("c.189_191del", True),
+        ("c.463+1G>A", True),
+        ("c.1_642del", False),
+        # 5'UTR: c.-200_100 spans 300 bases (there is no c.0)
+        ("c.-200_100del", False),
+        ("c.-5_10del", True),
+        ("c.-20_-10del", True),
+        # 3'UTR anchored after the stop codon
+        ("c.*5_*10del", True),
+        ("c.640_*3del", True),
+        # intronic offsets on one anchor are sized by the offsets
+        ("c.340+5_340+10del", True),
+        ("c.340+5_340+100del", False),
+        ("c.341-60_341-2del", False),
+        # crossing an intron of unknown length is not ruled out
+        ("c.340+5_341-3del", True),
+        # reversed ranges are malformed, never small
+        ("c.100_50del", False),
+    ],
+)
+def test_cdna_size_gate(cdna, expected):
+    assert is_snv_or_small_indel_hgvs(cdna) is expected
+    assert _gnomad_can_report(f"NM_000551.4:{cdna}") is expected
@@ -0,0 +1,837 @@
+# vhl_gnomad.py
+#
+# Shared gnomAD v4 backend for the frequency rules (BA1, BS1, PM2): HGVS
+# normalization, Ensembl VEP GRCh38 resolution and the gnomAD GraphQL lookup.
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transcript and cDNA patterns are shared with the HGVS parser, not recompiled.
+from vhl_hgvs import _RE_CDNA, _RE_TX
+
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback: same wire format, just slower
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Largest indel (bp) still looked up in gnomAD v4 short-variant calls
+MAX_SMALL_INDEL_BP = 50
+
+ENSEMBL_REST_SERVER = "https://rest.ensembl.org"
+ENSEMBL_VEP_HGVS_EXT = "/vep/human/hgvs"  # POST
+
+GNOMAD_GRAPHQL_URL = "https://gnomad.broadinstitute.org/api"
+# gnomAD browser dataset enum for v4 exomes/genomes
+GNOMAD_DATASET_ID = "gnomad_r4"
+
+# One keep-alive session for all Ensembl/gnomAD calls, so repeat lookups reuse
+# pooled TCP/TLS connections instead of handshaking per request. BA1, BS1 and
+# PM2 all share it, so the pool is sized for their batch workers together.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip",
+    "User-Agent": "vhlvcep/1.0",
+})
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # VEP /hgvs and gnomAD GraphQL are read-only POSTs, so they are safe
+        # to retry; urllib3 leaves POST out of its defaults.
+        allowed_methods=["GET", "HEAD", "POST"],
+    ),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# (connect, read) timeouts in seconds for VEP/gnomAD calls. A dead host fails
+# fast on connect; set VHL_HTTP_TIMEOUT to give slow batch replies longer.
+try:
+    _READ_TIMEOUT = float(os.environ.get("VHL_HTTP_TIMEOUT", "20"))
+except ValueError:
+    _READ_TIMEOUT = 20.0
+_REQUEST_TIMEOUT = (3.05, _READ_TIMEOUT)
+
+# Upper bound on a decoded VEP/gnomAD response body. A full 200-notation VEP
+# batch is a few MB; anything far beyond that is not a real answer.
+MAX_RESPONSE_BYTES = 32 * 1024 * 1024
+
+
+def _post_json(url: str, body: bytes):
+    """
+    POST a JSON body on the shared session and decode the JSON reply.
+
+    The response is streamed and abandoned once it passes MAX_RESPONSE_BYTES,
+    so a runaway body cannot balloon memory. Raises on HTTP errors,
+    oversize bodies and malformed JSON; callers log and degrade.
+    """
+    with _SESSION.post(
+        url, data=body, timeout=_REQUEST_TIMEOUT, stream=True
+    ) as resp:
+        resp.raise_for_status()
+        buf = bytearray()
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            buf += chunk
+            if len(buf) > MAX_RESPONSE_BYTES:
+                raise ValueError(
+                    f"response from {url} exceeds {MAX_RESPONSE_BYTES} bytes"
+                )
+    return _json_loads(bytes(buf))
+
+
+_warm_started = False
+
+
+def warm_connections() -> None:
+    """
+    Open keep-alive connections to Ensembl and gnomAD in a background thread,
+    so the first lookup does not pay for DNS and the TLS handshake. Runs once
+    per process; set VHL_NO_NET=1 to skip it.
+    """
+    global _warm_started
+    if _warm_started or os.environ.get("VHL_NO_NET") == "1":
+        return
+    _warm_started = True
+
+    def _warm():
+        for url in (ENSEMBL_REST_SERVER + "/info/ping", GNOMAD_GRAPHQL_URL):
+            try:
+                _SESSION.head(url, timeout=5)
+            except Exception as exc:
+                logger.debug("Connection warm-up for %s failed: %s", url, exc)
+
+    threading.Thread(target=_warm, name="vhl-gnomad-warm", daemon=True).start()
+
+
+# Persistent cache of Ensembl VEP / gnomAD lookups, fronted by an in-process
+# LRU so repeat lookups in one session skip SQLite too. Bump _CACHE_VERSION
+# when a lookup's return shape or query changes; set VHL_NO_CACHE=1 to bypass.
+_CACHE_VERSION = 1
+_CACHE_PATH = os.path.expanduser("~/.cache/vhl_gnomad/lookups.sqlite3")
+_CACHE_TTL_SECONDS = 7 * 86400
+_CACHE_MEMO_SIZE = 4096
+_CACHE_MISS = object()
+
+_cache_lock = threading.Lock()
+_cache_conn = None
+_cache_memo = OrderedDict()  # full key -> (value, stored timestamp)
+
+
+def _cache_db():
+    """Open the on-disk cache on first use; None if unavailable."""
+    global _cache_conn
+    if _cache_conn is None:
+        try:
+            os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+            conn = sqlite3.connect(_CACHE_PATH, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookups "
+                "(key TEXT PRIMARY KEY, value BLOB, stored REAL)"
+            )
+            _cache_conn = conn
+        except (OSError, sqlite3.Error) as exc:
+            logger.debug("Lookup cache unavailable at %s: %s", _CACHE_PATH, exc)
+            _cache_conn = False
+    return _cache_conn or None
+
+
+def _cache_memo_store(full_key: str, value, stored: float) -> None:
+    _cache_memo[full_key] = (value, stored)
+    _cache_memo.move_to_end(full_key)
+    if len(_cache_memo) > _CACHE_MEMO_SIZE:
+        _cache_memo.popitem(last=False)
+
+
+def _cache_get(kind: str, key: str):
+    if os.environ.get("VHL_NO_CACHE") == "1":
+        return _CACHE_MISS
+    full_key = f"{_CACHE_VERSION}|{kind}|{key}"
+    now = time.time()
+    with _cache_lock:
+        hit = _cache_memo.get(full_key)
+        if hit is not None and now - hit[1] <= _CACHE_TTL_SECONDS:
+            _cache_memo.move_to_end(full_key)
+            return hit[0]
+
+        db = _cache_db()
+        if db is None:
+            return _CACHE_MISS
+        try:
+            row = db.execute(
+                "SELECT value, stored FROM lookups WHERE key = ?", (full_key,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.debug("Lookup cache read failed for %s: %s", key, exc)
+            return _CACHE_MISS
+        if row is None or now - row[1] > _CACHE_TTL_SECONDS:
+            return _CACHE_MISS
+        value = _json_loads(row[0])
+        _cache_memo_store(full_key, value, row[1])
+    return value
+
+
+def _cache_put(kind: str, key: str, value) -> None:
+    if os.environ.get("VHL_NO_CACHE") == "1":
+        return
+    full_key = f"{_CACHE_VERSION}|{kind}|{key}"
+    now = time.time()
+    with _cache_lock:
+        _cache_memo_store(full_key, value, now)
+        db = _cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?)",
+                    (full_key, _json_dumps(value), now),
+                )
+        except sqlite3.Error as exc:
+            logger.debug("Lookup cache write failed for %s: %s", key, exc)
+
+
+def clear_lookup_cache() -> None:
+    """
+    Drop every cached VEP/gnomAD lookup, in memory and on disk. The cache is
+    shared by PM2, BA1 and BS1, so this refreshes all three.
+    """
+    with _cache_lock:
+        _cache_memo.clear()
+        db = _cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute("DELETE FROM lookups")
+        except sqlite3.Error as exc:
+            logger.debug("Lookup cache clear failed: %s", exc)
+
+
+def _safe_float(x) -> Optional[float]:
+    try:
+        if x is None:
+            return None
+        return float(x)
+    except (TypeError, ValueError):
+        return None
+
+
+# HGVS patterns used on every lookup, compiled once at import.
+_RE_CDNA_SNV = re.compile(r"c\.[-*]?\d+(?:[+-]\d+)?[ACGT]>[ACGT]$")
+# Groups: start anchor, start offset, end anchor, end offset, inserted bases
+_RE_CDNA_INDEL = re.compile(
+    r"c\.([-*]?\d+)([+-]\d+)?(?:_([-*]?\d+)([+-]\d+)?)?"
+    r"(?:delins|del|dup|ins)([ACGT]*)$"
+)
+_RE_TRAILING_PROTEIN = re.compile(r"\s*\(p\.[^)]+\)\s*$")
+# Genomic SNV on GRCh38, e.g. 'chr3:g.10191340A>T', '3:g.10191340A>T' or
+# 'NC_000003.12:g.10191340A>T' (the GRCh38 accession for chromosome 3).
+_RE_GENOMIC_SNV = re.compile(
+    r"(?:chr)?([0-9]{1,2}|X|Y|NC_000003\.12):g\.(\d+)([ACGT])>([ACGT])"
+)
+
+
+# Coding length of NM_000551.4 (213 codons + stop), which anchors c.*N
+_VHL_CDS_LENGTH = 642
+
+
+def _cdna_axis_pos(anchor: str) -> int:
+    """
+    Place a c. anchor ('-14', '120', '*5') on one linear axis. There is no
+    c.0, so c.-1 sits directly before c.1, and c.*1 directly after the stop.
+    """
+    if anchor[0] == "*":
+        return _VHL_CDS_LENGTH + int(anchor[1:])
+    pos = int(anchor)
+    return pos + 1 if pos < 0 else pos
+
+
+def is_snv_or_small_indel_hgvs(cdna: str) -> bool:
+    """
+    True if a cDNA HGVS like 'c.1A>T', 'c.263+1G>A' or 'c.189_191del' is a
+    single-nucleotide substitution or an indel of at most
+    MAX_SMALL_INDEL_BP bases, i.e. something gnomAD v4 catalogs as a
+    chrom-pos-ref-alt variantId. Anything else is a guaranteed gnomAD miss.
+
+    UTR ('c.-20', 'c.*5') and intronic ('c.340+5') positions are sized on the
+    transcript axis. A range whose ends sit on different anchors with an
+    intron between them has no size knowable from the HGVS alone, so it is
+    not ruled out here.
+    """
+    if not isinstance(cdna, str):
+        return False
+
+    if _RE_CDNA_SNV.match(cdna):
+        return True
+
+    m = _RE_CDNA_INDEL.match(cdna)
+    if not m:
+        return False
+
+    start_anchor, start_offset, end_anchor, end_offset, inserted = m.groups()
+    if end_anchor is None:
+        end_anchor, end_offset = start_anchor, start_offset
+    start = _cdna_axis_pos(start_anchor)
+    end = _cdna_axis_pos(end_anchor)
+    start_offset = int(start_offset or 0)
+    end_offset = int(end_offset or 0)
+
+    # An end pointing into the intron between the two anchors spans an
+    # intron of unknown length.
+    if start != end and (start_offset > 0 or end_offset < 0):
+        return len(inserted) <= MAX_SMALL_INDEL_BP
+
+    size = end - start + 1 + end_offset - start_offset
+    return 0 < size <= MAX_SMALL_INDEL_BP and len(inserted) <= MAX_SMALL_INDEL_BP
+
+
+def normalize_vhl_hgvs(hgvs_full: str) -> str:
+    """
+    Normalize full VHL HGVS like:
+      'NM_000551.4(VHL):c.1A>T (p.Met1Leu)'
+    to a clean transcript+cDNA string:
+      'NM_000551.4:c.1A>T'
+    """
+    if not isinstance(hgvs_full, str):
+        return hgvs_full
+
+    core = _RE_TRAILING_PROTEIN.sub("", hgvs_full)
+
+    m_tx = _RE_TX.match(core)
+    transcript = m_tx.group(1) if m_tx else "NM_000551.4"
+
+    m_c = _RE_CDNA.search(core)
+    cdna = m_c.group(1) if m_c else None
+
+    if cdna is None:
+        return core
+    return f"{transcript}:{cdna}"
+
+
+def parse_genomic_hgvs_grch38(hgvs: str) -> Optional[Tuple[str, int, str, str]]:
+    """
+    Parse a GRCh38 genomic SNV like 'chr3:g.10191340A>T' straight to
+    (chrom, pos, ref, alt); None for anything else (e.g. cDNA HGVS).
+    """
+    if not isinstance(hgvs, str):
+        return None
+    m = _RE_GENOMIC_SNV.fullmatch(hgvs.strip())
+    if not m:
+        return None
+    chrom = m.group(1)
+    if chrom == "NC_000003.12":
+        chrom = "3"
+    return chrom, int(m.group(2)), m.group(3), m.group(4)
+
+
+def resolve_hgvs_to_grch38(hgvs_tx: str) -> Optional[Tuple[str, int, str, str]]:
+    """
+    Resolve transcript HGVS (e.g. 'NM_000551.4:c.1A>T') to GRCh38 genomic
+    coordinates: (chrom, pos, ref, alt) using Ensembl VEP /hgvs.
+
+    Input that is already a GRCh38 genomic SNV is parsed locally without a
+    VEP round trip.
+    """
+    genomic = parse_genomic_hgvs_grch38(hgvs_tx)
+    if genomic is not None:
+        return genomic
+
+    cached = _cache_get("vep", hgvs_tx)
+    if cached is not _CACHE_MISS:
+        return tuple(cached)
+
+    data = {
+        "hgvs_notations": [hgvs_tx],
+        "assembly_name": "GRCh38",
+    }
+
+    try:
+        decoded = _post_json(
+            ENSEMBL_REST_SERVER + ENSEMBL_VEP_HGVS_EXT, _json_dumps(data)
+        )
+    except Exception as exc:
+        logger.warning("Ensembl VEP HGVS resolve failed for %s: %s", hgvs_tx, exc)
+        return None
+
+    if not isinstance(decoded, list) or not decoded:
+        return None
+    resolved = _vep_record_coords(decoded[0], hgvs_tx)
+    if resolved is None:
+        return None
+
+    # Only successful resolutions are cached; failures may be transient.
+    _cache_put("vep", hgvs_tx, list(resolved))
+    return resolved
+
+
+def _vep_record_coords(rec, hgvs_tx: str) -> Optional[Tuple[str, int, str, str]]:
+    """Pull (chrom, pos, ref, alt) out of one VEP /hgvs result record."""
+    try:
+        if rec.get("assembly_name") != "GRCh38":
+            logger.warning(
+                "HGVS %s resolved to %s, not GRCh38",
+                hgvs_tx,
+                rec.get("assembly_name"),
+            )
+
+        chrom = str(rec["seq_region_name"]).removeprefix("chr")
+        pos = int(rec["start"])
+        allele_string = rec["allele_string"]
+        ref, alt = allele_string.split("/")
+    except Exception as exc:
+        logger.warning("Unexpected VEP response for %s: %s", hgvs_tx, exc)
+        return None
+    return chrom, pos, ref, alt
+
+
+# Ensembl caps POST /vep/human/hgvs at 200 notations per request.
+VEP_BATCH_SIZE = 200
+
+
+def resolve_hgvs_batch_to_grch38(
+    hgvs_txs: List[str],
+) -> List[Optional[Tuple[str, int, str, str]]]:
+    """
+    Batch form of resolve_hgvs_to_grch38: one result per input, in order.
+
+    Genomic input and cached resolutions are answered locally; the rest go to
+    Ensembl VEP as one POST per VEP_BATCH_SIZE notations. If a batch POST
+    fails outright, its notations are retried one at a time so a single bad
+    HGVS cannot sink the whole chunk.
+    """
+    results = {}
+    pending = []
+    for hgvs_tx in dict.fromkeys(hgvs_txs):
+        genomic = parse_genomic_hgvs_grch38(hgvs_tx)
+        if genomic is not None:
+            results[hgvs_tx] = genomic
+            continue
+        cached = _cache_get("vep", hgvs_tx)
+        if cached is not _CACHE_MISS:
+            results[hgvs_tx] = tuple(cached)
+        else:
+            pending.append(hgvs_tx)
+
+    for start in range(0, len(pending), VEP_BATCH_SIZE):
+        chunk = pending[start:start + VEP_BATCH_SIZE]
+        results.update(_resolve_vep_chunk(chunk))
+
+    return [results[hgvs_tx] for hgvs_tx in hgvs_txs]
+
+
+def _resolve_vep_chunk(hgvs_txs) -> dict:
+    """One VEP POST for up to VEP_BATCH_SIZE notations, keyed by input."""
+    data = {
+        "hgvs_notations": hgvs_txs,
+        "assembly_name": "GRCh38",
+    }
+
+    try:
+        decoded = _post_json(
+            ENSEMBL_REST_SERVER + ENSEMBL_VEP_HGVS_EXT, _json_dumps(data)
+        )
+    except Exception as exc:
+        logger.warning(
+            "Ensembl VEP batch resolve failed for %d HGVS: %s", len(hgvs_txs), exc
+        )
+        if len(hgvs_txs) == 1:
+            return {hgvs_txs[0]: None}
+        return {hgvs_tx: resolve_hgvs_to_grch38(hgvs_tx) for hgvs_tx in hgvs_txs}
+
+    # VEP may return several records per input (or none for a bad one); the
+    # first record for each input wins, matching the single-variant path.
+    out = dict.fromkeys(hgvs_txs)
+    for rec in decoded or ():
+        hgvs_tx = rec.get("input") if isinstance(rec, dict) else None
+        if hgvs_tx not in out or out[hgvs_tx] is not None:
+            continue
+        resolved = _vep_record_coords(rec, hgvs_tx)
+        if resolved is not None:
+            _cache_put("vep", hgvs_tx, list(resolved))
+            out[hgvs_tx] = resolved
+    return out
+
+
+# Only AC and FAF95 popmax are read, so nothing else is selected.
+_GNOMAD_VARIANT_FIELDS = "exome { ac faf95 { popmax } } genome { ac faf95 { popmax } }"
+
+_GNOMAD_VARIANT_QUERY = (
+    "query VariantQuery($variantId: String!, $datasetId: DatasetId!) { "
+    f"variant(variantId: $variantId, dataset: $datasetId) {{ {_GNOMAD_VARIANT_FIELDS} }} }}"
+)
+
+# The query text never changes, so its JSON encoding is done once; each call
+# only serializes its variables and closes the object.
+_GNOMAD_VARIANT_BODY_PREFIX = (
+    b'{"query":' + _json_dumps(_GNOMAD_VARIANT_QUERY) + b',"variables":'
+)
+
+
+def lookup_gnomad_v4_grch38(
+    chrom: str, pos: int, ref: str, alt: str
+) -> Tuple[bool, Optional[float]]:
+    """
+    Look up a GRCh38 SNV/indel in gnomAD v4 via the gnomAD browser GraphQL
+    endpoint and return:
+        (present_in_gnomad, groupmax_faf)
+
+    Uses exome/genome faf95.popmax (FAF95 popmax). Intended for light use.
+    """
+    # gnomAD v4 variantId format is "3-10142007-A-T" (no "chr" prefix).
+    variant_id = f"{chrom}-{pos}-{ref}-{alt}"
+
+    cached = _cache_get("gnomad", variant_id)
+    if cached is not _CACHE_MISS:
+        return tuple(cached)
+
+    variables = {
+        "variantId": variant_id,
+        "datasetId": GNOMAD_DATASET_ID,
+    }
+
+    try:
+        data = _post_json(
+            GNOMAD_GRAPHQL_URL,
+            _GNOMAD_VARIANT_BODY_PREFIX + _json_dumps(variables) + b"}",
+        )
+    except Exception as exc:
+        logger.warning("gnomAD GraphQL error for %s: %s", variant_id, exc)
+        return False, None
+
+    if "errors" in data:
+        logger.debug("gnomAD GraphQL errors for %s: %s", variant_id, data["errors"])
+        return False, None
+
+    # Only answered queries are cached; request/GraphQL errors may be transient.
+    result = _gnomad_presence_and_faf((data.get("data") or {}).get("variant"))
+    _cache_put("gnomad", variant_id, list(result))
+    return result
+
+
+# Variants per aliased GraphQL request; keeps each POST well under gnomAD's
+# per-query complexity limit.
+GNOMAD_BATCH_SIZE = 50
+
+
+def lookup_gnomad_v4_batch(variants) -> List[Tuple[bool, Optional[float]]]:
+    """
+    Batch form of lookup_gnomad_v4_grch38 for (chrom, pos, ref, alt) tuples.
+
+    Cached variants are answered locally; the rest go out as aliased
+    'v0: variant(...) v1: variant(...)' GraphQL queries, GNOMAD_BATCH_SIZE
+    per POST. Returns one (present_in_gnomad, groupmax_faf) per input.
+    """
+    variant_ids = [f"{chrom}-{pos}-{ref}-{alt}" for chrom, pos, ref, alt in variants]
+
+    results = {}
+    pending = []
+    for variant_id in dict.fromkeys(variant_ids):
+        cached = _cache_get("gnomad", variant_id)
+        if cached is not _CACHE_MISS:
+            results[variant_id] = tuple(cached)
+        else:
+            pending.append(variant_id)
+
+    for start in range(0, len(pending), GNOMAD_BATCH_SIZE):
+        chunk = pending[start:start + GNOMAD_BATCH_SIZE]
+        results.update(_query_gnomad_v4_chunk(chunk))
+
+    return [results[variant_id] for variant_id in variant_ids]
+
+
+def _query_gnomad_v4_chunk(variant_ids) -> dict:
+    """One aliased GraphQL POST for up to GNOMAD_BATCH_SIZE variantIds."""
+    query = "query VariantBatch {\n%s\n}" % "\n".join(
+        f"  v{i}: variant(variantId: {_json_dumps(variant_id).decode()}, "
+        f"dataset: {GNOMAD_DATASET_ID}) {{ {_GNOMAD_VARIANT_FIELDS} }}"
+        for i, variant_id in enumerate(variant_ids)
+    )
+    failed = {variant_id: (False, None) for variant_id in variant_ids}
+
+    try:
+        data = _post_json(GNOMAD_GRAPHQL_URL, _json_dumps({"query": query}))
+    except Exception as exc:
+        logger.warning(
+            "gnomAD GraphQL batch error for %d variants: %s", len(variant_ids), exc
+        )
+        return failed
+
+    # Per-variant errors carry the alias in their path; anything else means
+    # the whole query failed.
+    errored = set()
+    for err in data.get("errors") or ():
+        path = err.get("path") or ()
+        if not path:
+            logger.debug("gnomAD GraphQL batch errors: %s", data["errors"])
+            return failed
+        errored.add(path[0])
+    if errored:
+        logger.debug("gnomAD GraphQL errors for %s", sorted(errored))
+
+    block = data.get("data")
+    if not isinstance(block, dict):
+        return failed
+
+    out = {}
+    for i, variant_id in enumerate(variant_ids):
+        if f"v{i}" in errored:
+            out[variant_id] = (False, None)
+            continue
+        result = _gnomad_presence_and_faf(block.get(f"v{i}"))
+        _cache_put("gnomad", variant_id, list(result))
+        out[variant_id] = result
+    return out
+
+
+def _gnomad_presence_and_faf(v) -> Tuple[bool, Optional[float]]:
+    """Reduce a gnomAD GraphQL variant record to (present_in_gnomad, groupmax_faf)."""
+    if v is None:
+        # variant absent
+        return False, None
+
+    exome = v.get("exome") or {}
+    genome = v.get("genome") or {}
+
+    # Determine presence from AC
+    ac_exome = exome.get("ac")
+    ac_genome = genome.get("ac")
+    if not (
+        (isinstance(ac_exome, int) and ac_exome > 0)
+        or (isinstance(ac_genome, int) and ac_genome > 0)
+    ):
+        # no alternate alleles observed even if record exists
+        return False, None
+
+    # Collect FAF95 popmax values; gnomAD returns numbers or null (e.g. a
+    # missing genome block), so only fall back to _safe_float for anything else.
+    faf_values = []
+    for faf in (
+        (exome.get("faf95") or {}).get("popmax"),
+        (genome.get("faf95") or {}).get("popmax"),
+    ):
+        if faf is None:
+            continue
+        if not isinstance(faf, (int, float)):
+            faf = _safe_float(faf)
+            if faf is None:
+                continue
+        faf_values.append(faf)
+
+    if not faf_values:
+        # present but no FAF95 popmax reported
+        return True, None
+
+    groupmax_faf = max(faf_values)
+    return True, groupmax_faf
+
+
+def gnomad_evidence(hgvs_full: str, size_gate: bool = True):
+    """
+    Normalize a VHL HGVS, resolve it to GRCh38 and look it up in gnomAD v4.
+
+    Returns:
+        (hgvs_tx, coord, present_in_gnomad, groupmax_faf, stop) where stop is
+        "NOT_SNV" or "UNRESOLVED" if the variant never reached gnomAD, else None.
+        With size_gate=False every variant is resolved, so stop is never NOT_SNV.
+    """
+    # Normalize HGVS to transcript:cDNA
+    hgvs_tx = normalize_vhl_hgvs(hgvs_full)
+
+    # Large/structural events are never in gnomAD v4 as chrom-pos-ref-alt;
+    # reject them before spending two network round-trips.
+    if size_gate and not _gnomad_can_report(hgvs_tx):
+        return hgvs_tx, None, False, None, "NOT_SNV"
+
+    # Resolve to GRCh38 genomic coordinates via Ensembl VEP /hgvs
+    resolved = resolve_hgvs_to_grch38(hgvs_tx)
+    if resolved is None:
+        return hgvs_tx, None, False, None, "UNRESOLVED"
+
+    chrom, pos, ref, alt = resolved
+
+    # Look up the GRCh38 variant in gnomAD v4 via GraphQL
+    present, faf = lookup_gnomad_v4_grch38(chrom, pos, ref, alt)
+    return hgvs_tx, f"{chrom}-{pos}-{ref}-{alt}, GRCh38", present, faf, None
+
+
+def gnomad_evidence_batch(hgvs_list, size_gate: bool = True) -> list:
+    """
+    Batch form of gnomad_evidence: one evidence tuple per input, in order.
+
+    Distinct HGVS are resolved with batched VEP POSTs and looked up with
+    aliased gnomAD GraphQL queries, rather than two round-trips apiece.
+    """
+    unique = list(dict.fromkeys(hgvs_list))
+    hgvs_txs = [normalize_vhl_hgvs(hgvs_full) for hgvs_full in unique]
+
+    evidence = {}
+    to_resolve = []
+    for hgvs_full, hgvs_tx in zip(unique, hgvs_txs):
+        if not size_gate or _gnomad_can_report(hgvs_tx):
+            to_resolve.append((hgvs_full, hgvs_tx))
+        else:
+            evidence[hgvs_full] = (hgvs_tx, None, False, None, "NOT_SNV")
+
+    resolved = resolve_hgvs_batch_to_grch38([hgvs_tx for _, hgvs_tx in to_resolve])
+    hits = iter(lookup_gnomad_v4_batch([r for r in resolved if r is not None]))
+    for (hgvs_full, hgvs_tx), coords in zip(to_resolve, resolved):
+        if coords is None:
+            evidence[hgvs_full] = (hgvs_tx, None, False, None, "UNRESOLVED")
+            continue
+        chrom, pos, ref, alt = coords
+        present, faf = next(hits)
+        evidence[hgvs_full] = (
+            hgvs_tx, f"{chrom}-{pos}-{ref}-{alt}, GRCh38", present, faf, None
+        )
+
+    return [evidence[hgvs_full] for hgvs_full in hgvs_list]
+
+
+def _gnomad_can_report(hgvs_tx: str) -> bool:
+    """
+    False for large/structural cDNA events, which are never in gnomAD v4 as
+    chrom-pos-ref-alt. The size gate only reads c. notation; genomic,
+    protein-only and other shapes go to VEP, which decides whether they
+    resolve.
+    """
+    cdna = hgvs_tx.rpartition(":")[2]
+    return not cdna.startswith("c.") or is_snv_or_small_indel_hgvs(cdna)
+
+
+############################# FREQUENCY RULES #################################
+
+# Context templates shared by the benign stand-alone/strong rules (BA1, BS1);
+# {label} and {cutoff} come from the rule, the rest from the lookup.
+BENIGN_FAF_CONTEXTS = {
+    "NOT_SNV": (
+        "{hgvs_tx} is not an SNV or small indel that gnomAD v4 can report; "
+        "{label} not applied."
+    ),
+    "UNRESOLVED": (
+        "Could not resolve {hgvs_tx} to GRCh38 genomic coordinates; "
+        "{label} not applied."
+    ),
+    "ABSENT": "{hgvs} ({coord}) is absent from gnomAD v4; {label} not applied.",
+    "NO_FAF": (
+        "{hgvs} ({coord}) is present in gnomAD v4 but has no GroupMax "
+        "Filtering Allele Frequency; {label} not applied."
+    ),
+    "MEETS": (
+        "{hgvs} ({coord}) has GroupMax FAF ≈{faf:.3e} in gnomAD v4, "
+        "≥{cutoff}; {label} applied."
+    ),
+    "MISSES": (
+        "{hgvs} ({coord}) has GroupMax FAF ≈{faf:.3e} in gnomAD v4, "
+        "below {cutoff}; {label} not applied."
+    ),
+}
+
+
+class FrequencyRule(NamedTuple):
+    """
+    A GroupMax FAF rule over the gnomAD v4 lookup (BA1, BS1, PM2).
+
+    A lookup reduces to one outcome code: NOT_SNV / UNRESOLVED when it never
+    reached gnomAD, ABSENT, NO_FAF, or MEETS / MISSES depending on
+    meets(faf, threshold). decision maps outcomes to the strength they assign
+    (missing outcomes assign none); contexts maps every outcome to a template.
+    """
+
+    label: str
+    threshold: float
+    cutoff: str
+    meets: Callable[[float, float], bool]
+    contexts: dict
+    decision: dict
+    size_gate: bool = True
+
+
+def _frequency_outcome(present: bool, faf, meets_cutoff) -> str:
+    if not present:
+        return "ABSENT"
+    if faf is None:
+        return "NO_FAF"
+    return "MEETS" if meets_cutoff else "MISSES"
+
+
+def _frequency_result(rule: FrequencyRule, hgvs_full: str, evidence, meets_cutoff) -> dict:
+    hgvs_tx, coord, present, faf, outcome = evidence
+    if outcome is None:
+        outcome = _frequency_outcome(present, faf, meets_cutoff)
+
+    return {
+        "strength": rule.decision.get(outcome),
+        "context": rule.contexts[outcome].format(
+            hgvs=hgvs_full,
+            hgvs_tx=hgvs_tx,
+            coord=coord,
+            faf=faf,
+            label=rule.label,
+            cutoff=rule.cutoff,
+        ),
+        "present_in_gnomad": present,
+        "groupmax_faf": faf,
+    }
+
+
+def classify_frequency_rule(rule: FrequencyRule, hgvs_full: str) -> dict:
+    """Apply a FrequencyRule to one HGVS; returns the classifier result dict."""
+    evidence = gnomad_evidence(hgvs_full, size_gate=rule.size_gate)
+    faf = evidence[3]
+    return _frequency_result(
+        rule, hgvs_full, evidence, faf is not None and rule.meets(faf, rule.threshold)
+    )
+
+
+def classify_frequency_rule_batch(rule: FrequencyRule, hgvs_list) -> list:
+    """
+    Apply a FrequencyRule to a list of HGVS strings; returns one result dict
+    per input.
+
+    Distinct HGVS are resolved and looked up in batched VEP/gnomAD requests,
+    and the FAF threshold test is a single vectorized comparison over the
+    whole batch (missing FAF -> NaN, which never meets the cutoff).
+    """
+    # Resolve and look up each distinct HGVS once, then scatter back.
+    unique = list(dict.fromkeys(hgvs_list))
+    evidence = gnomad_evidence_batch(unique, size_gate=rule.size_gate)
+
+    faf_arr = np.fromiter(
+        (e[3] if e[3] is not None else np.nan for e in evidence),
+        dtype=np.float64,
+        count=len(evidence),
+    )
+    meets_mask = rule.meets(faf_arr, rule.threshold)
+
+    results = {
+        hgvs_full: _frequency_result(rule, hgvs_full, e, bool(meets_cutoff))
+        for hgvs_full, e, meets_cutoff in zip(unique, evidence, meets_mask)
+    }
+    return [dict(results[hgvs_full]) for hgvs_full in hgvs_list]
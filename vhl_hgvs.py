@@ -2,6 +2,12 @@
 
 import re
 
+# Compiled once at import rather than on every parse_vhl_hgvs call. The
+# transcript prefix matches with or without the '(VHL)' gene tag in one pass.
+_RE_TX = re.compile(r"^([A-Z0-9_.]+)(?:\(VHL\)|:)")
+_RE_CDNA = re.compile(r"(c\.[^ \)]+)")
+_RE_PROTEIN = re.compile(r"\(p\.([^)\s]+)\)")
+
 
 def parse_vhl_hgvs(hgvs_full: str):
     """
@@ -20,17 +26,15 @@ def parse_vhl_hgvs(hgvs_full: str):
         return None, None, None
 
     # Transcript, allowing optional '(VHL)'.
-    m_tx = re.match(r"^([A-Z0-9_.]+)\(VHL\)", hgvs_full)
-    if not m_tx:
-        m_tx = re.match(r"^([A-Z0-9_.]+):", hgvs_full)
+    m_tx = _RE_TX.match(hgvs_full)
     transcript = m_tx.group(1) if m_tx else "NM_000551.4"
 
     # cDNA HGVS.
-    m_c = re.search(r"(c\.[^ \)]+)", hgvs_full)
+    m_c = _RE_CDNA.search(hgvs_full)
     cdna = m_c.group(1) if m_c else None
 
     # Protein HGVS.
-    m_p = re.search(r"\(p\.([^)\s]+)\)", hgvs_full)
+    m_p = _RE_PROTEIN.search(hgvs_full)
     protein = f"p.{m_p.group(1)}" if m_p else None
 
     return transcript, cdna, protein
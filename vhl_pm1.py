@@ -15,16 +15,20 @@ Only simple missense substitutions are eligible.
 """
 
 import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
 
 from vhl_hgvs import parse_vhl_hgvs
 
 
 # Germline missense hotspot codons (Stebbins + Chiorean; keep synced to VCEP table).
-GERMLINE_HOTSPOT_POSITIONS = {
+GERMLINE_HOTSPOT_POSITIONS = frozenset({
     167, 162, 178, 98, 78, 86,   # Stebbins
     65, 76, 80, 88, 96, 112, 117,
     161, 170, 176,
-}
+})
 
 # Somatic hotspot codons from cancerhotspots.org / Walsh (not treated as
 # somatic if also in GERMLINE_HOTSPOT_POSITIONS). Values are tumor counts.
@@ -49,16 +53,30 @@ SOMATIC_HOTSPOT_COUNTS = {
 # Critical pVHL functional domain for PM1: 63–192 AA.
 PM1_FUNCTIONAL_DOMAINS = [(63, 192)]
 
+# Codon-indexed bitmap of PM1_FUNCTIONAL_DOMAINS (covers pVHL213 with room to
+# spare), so domain membership is a single byte read however many domains.
+_PM1_BITMAP = bytes(
+    any(start <= i <= end for start, end in PM1_FUNCTIONAL_DOMAINS)
+    for i in range(256)
+)
+
+# Simple missense only: rejects nonsense, synonymous, frameshift and in-frame
+# indel tokens in the same pass as the shape check.
+_RE_SIMPLE_MISSENSE = re.compile(
+    r"p\.(?!.*(?:\*|Ter|=|fs|del|ins|dup))[A-Za-z]{3}\d+[A-Za-z]{3}"
+)
+_NON_MISSENSE_TAGS = ("fs", "del", "ins", "dup", "Ter", "*", "=")
+
 
 def _parse_protein_codon(hgvs_protein: str):
-    """Extract the amino‑acid position from a protein HGVS string."""
-    if not hgvs_protein:
+    """
+    Extract the amino‑acid position from a simple missense 'p.XxxNNNYyy'
+    string (as validated by _is_simple_missense) by slicing out the digits.
+    """
+    try:
+        return int(hgvs_protein[5:-3])
+    except (TypeError, ValueError):
         return None
-    if not hgvs_protein.startswith("p."):
-        hgvs_protein = "p." + hgvs_protein
-
-    m = re.search(r"p\.[A-Za-z]{3}(\d+)[A-Za-z*=?]+", hgvs_protein)
-    return int(m.group(1)) if m else None
 
 
 def _is_simple_missense(hgvs_protein: str) -> bool:
@@ -71,17 +89,134 @@ def _is_simple_missense(hgvs_protein: str) -> bool:
     if not hgvs_protein.startswith("p."):
         hgvs_protein = "p." + hgvs_protein
 
-    if any(x in hgvs_protein for x in ["*", "Ter", "=", "fs", "del", "ins", "dup"]):
+    return bool(_RE_SIMPLE_MISSENSE.fullmatch(hgvs_protein))
+
+
+def _obviously_not_missense(hgvs_full: str) -> bool:
+    """
+    Cheap substring pre-check run before any regex: True when the input has no
+    '(p.…)' part, or its protein part carries a non-missense token.
+    """
+    if not isinstance(hgvs_full, str):
+        return True
+    _, sep, rest = hgvs_full.partition("(p.")
+    if not sep:
+        return True
+    protein, close, _ = rest.partition(")")
+    # Only trust this span when it is exactly what parse_vhl_hgvs would capture.
+    if not close or protein != "".join(protein.split()):
         return False
+    return any(tag in protein for tag in _NON_MISSENSE_TAGS)
+
 
-    return bool(re.fullmatch(r"p\.[A-Za-z]{3}\d+[A-Za-z]{3}", hgvs_protein))
+# PM1 outcomes keyed by code: (strength, context template).
+_PM1_OUTCOMES = {
+    "NOT_MISSENSE": (
+        None,
+        "PM1 is specified only for simple missense variants in VHL; "
+        "this protein HGVS does not represent a missense substitution.",
+    ),
+    "NO_CODON": (
+        None,
+        "Could not parse an amino‑acid position from the protein HGVS; "
+        "PM1 not applied.",
+    ),
+    "GERMLINE": (
+        "PM1",
+        "Amino acid {codon} is a curated germline missense hotspot in VHL; "
+        "assign PM1 (Moderate).",
+    ),
+    "SOMATIC_STRONG": (
+        "PM1",
+        "Amino acid {codon} is a somatic hotspot with ≥10 tumors reported "
+        "in cancerhotspots.org/Walsh and is not a germline hotspot; "
+        "assign PM1 (Moderate).",
+    ),
+    "SOMATIC_SUPPORTING": (
+        "PM1_Supporting",
+        "Amino acid {codon} is a somatic hotspot with <10 tumors reported "
+        "in cancerhotspots.org/Walsh and is not a germline hotspot; "
+        "assign PM1_Supporting.",
+    ),
+    "DOMAIN": (
+        "PM1",
+        "Amino acid {codon} lies within a key functional domain of pVHL "
+        "(AA 63–192) that is enriched for pathogenic missense and lacks "
+        "benign variation; assign PM1 (Moderate).",
+    ),
+    "NONE": (
+        None,
+        "Amino acid {codon} is not in the curated germline or somatic hotspot "
+        "lists and lies outside defined key functional domains; PM1 not applied.",
+    ),
+}
+
+# Each rule's verdict is encoded as a priority code (index into
+# _PM1_RULE_OUTCOMES), ranked in the order the VCEP rules are checked:
+# germline (4) > somatic ≥10 (3) > somatic 1–9 (2) > domain (1) > none (0).
+_PM1_RULE_OUTCOMES = ("NONE", "DOMAIN", "SOMATIC_SUPPORTING", "SOMATIC_STRONG", "GERMLINE")
+
+
+def _build_pm1_rule_table() -> np.ndarray:
+    """
+    Codon-indexed table of PM1 priority codes, so each lookup is one read.
+    Rules are filled lowest priority first, so a higher-ranked rule
+    overwrites a lower one on the same codon.
+    """
+    table = np.frombuffer(_PM1_BITMAP, dtype=np.uint8).copy()  # DOMAIN = 1
+    for codon, count in SOMATIC_HOTSPOT_COUNTS.items():
+        if count > 0:
+            table[codon] = 3 if count >= 10 else 2
+    table[list(GERMLINE_HOTSPOT_POSITIONS)] = 4
+    return table
+
+
+_PM1_RULE_TABLE = _build_pm1_rule_table()
+# bytes copy for the scalar path, where indexing beats a NumPy scalar read.
+_PM1_RULE_BYTES = _PM1_RULE_TABLE.tobytes()
+
+
+class PM1Result(NamedTuple):
+    """Immutable PM1 outcome; classify_vhl_pm1 hands callers its _asdict()."""
+
+    strength: Optional[str]
+    context: str
+
+
+# Outcomes whose context does not depend on the codon are shared singletons.
+_PM1_FIXED_RESULTS = {
+    outcome: PM1Result(strength, template)
+    for outcome, (strength, template) in _PM1_OUTCOMES.items()
+    if "{codon}" not in template
+}
 
 
-def _residue_in_pm1_domain(codon: int) -> bool:
-    """Return True if the codon is within any PM1‑relevant pVHL functional domain."""
+def _pm1_result(outcome: str, codon) -> PM1Result:
+    fixed = _PM1_FIXED_RESULTS.get(outcome)
+    if fixed is not None:
+        return fixed
+    strength, template = _PM1_OUTCOMES[outcome]
+    return PM1Result(strength, template.format(codon=codon))
+
+
+def _pm1_eligible_codon(hgvs_full: str):
+    """
+    Parse an HGVS string down to its PM1-relevant codon.
+
+    Returns (outcome, codon), where outcome is NOT_MISSENSE / NO_CODON when the
+    variant cannot be scored and None when the codon needs a hotspot/domain check.
+    """
+    # Restrict PM1 to simple missense substitutions.
+    if _obviously_not_missense(hgvs_full):
+        return "NOT_MISSENSE", None
+    _, _, protein = parse_vhl_hgvs(hgvs_full)
+    if not _is_simple_missense(protein):
+        return "NOT_MISSENSE", None
+
+    codon = _parse_protein_codon(protein)
     if codon is None:
-        return False
-    return any(start <= codon <= end for start, end in PM1_FUNCTIONAL_DOMAINS)
+        return "NO_CODON", None
+    return None, codon
 
 
 def classify_vhl_pm1(hgvs_full: str):
@@ -93,75 +228,53 @@ def classify_vhl_pm1(hgvs_full: str):
             - strength: "PM1", "PM1_Supporting", or None
             - context: human‑readable explanation string
     """
-    _, _, protein = parse_vhl_hgvs(hgvs_full)
-    codon = _parse_protein_codon(protein)
+    return _classify_vhl_pm1_cached(hgvs_full)._asdict()
 
-    # Restrict PM1 to simple missense substitutions.
-    if not _is_simple_missense(protein):
-        return {
-            "strength": None,
-            "context": (
-                "PM1 is specified only for simple missense variants in VHL; "
-                "this protein HGVS does not represent a missense substitution."
-            ),
-        }
 
-    if codon is None:
-        return {
-            "strength": None,
-            "context": (
-                "Could not parse an amino‑acid position from the protein HGVS; "
-                "PM1 not applied."
-            ),
-        }
-
-    # 1) Germline missense hotspots (Moderate).
-    if codon in GERMLINE_HOTSPOT_POSITIONS:
-        return {
-            "strength": "PM1",
-            "context": (
-                f"Amino acid {codon} is a curated germline missense hotspot in VHL; "
-                "assign PM1 (Moderate)."
-            ),
-        }
-
-    # 2) Somatic hotspots from cancerhotspots.org / Walsh (not germline).
-    som_count = SOMATIC_HOTSPOT_COUNTS.get(codon, 0)
-    if som_count >= 10:
-        return {
-            "strength": "PM1",
-            "context": (
-                f"Amino acid {codon} is a somatic hotspot with ≥10 tumors reported "
-                "in cancerhotspots.org/Walsh and is not a germline hotspot; "
-                "assign PM1 (Moderate)."
-            ),
-        }
-    if 0 < som_count < 10:
-        return {
-            "strength": "PM1_Supporting",
-            "context": (
-                f"Amino acid {codon} is a somatic hotspot with <10 tumors reported "
-                "in cancerhotspots.org/Walsh and is not a germline hotspot; "
-                "assign PM1_Supporting."
-            ),
-        }
-
-    # 3) Critical functional domains (63–192 AA).
-    if _residue_in_pm1_domain(codon):
-        return {
-            "strength": "PM1",
-            "context": (
-                f"Amino acid {codon} lies within a key functional domain of pVHL "
-                "(AA 63–192) that is enriched for pathogenic missense and lacks "
-                "benign variation; assign PM1 (Moderate)."
-            ),
-        }
-
-    # 4) No PM1 evidence.
-    return {
-        "strength": None,
-        "context": (
-            f"Amino acid {codon} is not in the curated germline or somatic hotspot "
-            "lists and lies outside defined key functional domains; PM1 not applied."
-        ),
-    }
\ No newline at end of file
+@lru_cache(maxsize=4096)
+def _classify_vhl_pm1_cached(hgvs_full: str) -> PM1Result:
+    """
+    Memoized PM1 decision as an immutable PM1Result, so repeat HGVS strings
+    (Streamlit reruns, duplicate rows) skip the parse entirely.
+    """
+    outcome, codon = _pm1_eligible_codon(hgvs_full)
+
+    if outcome is None:
+        # Germline hotspot > somatic hotspot (≥10, then 1–9) > 63–192 domain.
+        rule = _PM1_RULE_BYTES[codon] if 0 <= codon < len(_PM1_RULE_BYTES) else 0
+        outcome = _PM1_RULE_OUTCOMES[rule]
+
+    return _pm1_result(outcome, codon)
+
+
+def classify_vhl_pm1_batch(hgvs_list):
+    """
+    PM1 classifier for a list of HGVS strings; returns one result dict per input.
+
+    Each distinct HGVS is parsed once, and the hotspot/domain decision for
+    every eligible codon is a single gather from the precomputed rule table.
+    """
+    # Parse and classify each distinct HGVS once, then scatter back.
+    unique = list(dict.fromkeys(hgvs_list))
+    parsed = [_pm1_eligible_codon(hgvs_full) for hgvs_full in unique]
+    eligible = [i for i, (outcome, _) in enumerate(parsed) if outcome is None]
+
+    # Codons outside the tables index slot 0, which is empty in all of them.
+    # Clamped in Python so arbitrarily large positions never reach NumPy.
+    codons = [parsed[i][1] for i in eligible]
+    idx = np.fromiter(
+        (c if 0 <= c < len(_PM1_BITMAP) else 0 for c in codons),
+        dtype=np.int64,
+        count=len(codons),
+    )
+    rule = _PM1_RULE_TABLE[idx]
+
+    outcomes = [outcome for outcome, _ in parsed]
+    for i, code in zip(eligible, rule.tolist()):
+        outcomes[i] = _PM1_RULE_OUTCOMES[code]
+
+    results = {
+        hgvs_full: _pm1_result(outcome, codon)
+        for hgvs_full, outcome, (_, codon) in zip(unique, outcomes, parsed)
+    }
+    return [results[hgvs_full]._asdict() for hgvs_full in hgvs_list]
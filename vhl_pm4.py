@@ -1,5 +1,7 @@
 import re
 
+import numpy as np
+
 
 ######################### VHL CONSTANTS #######################################
 
@@ -19,12 +21,36 @@ CRITICAL_DOMAINS = [
     (193, 204)   # 2nd beta domain
 ]
 
+
+def _contiguous_span(domains):
+    """
+    (first start, last end) of abutting AA domains, so membership in any of
+    them is one range test. Raises ValueError if the domains leave a gap.
+    """
+    for (_, end), (nxt, _) in zip(domains, domains[1:]):
+        if end + 1 != nxt:
+            raise ValueError(f"Domains {domains} are not contiguous at AA {end}–{nxt}")
+    return domains[0][0], domains[-1][1]
+
+
+_CRITICAL_START, _CRITICAL_END = _contiguous_span(CRITICAL_DOMAINS)
+
+# Met54 starts the shorter pVHL19 isoform; PM4 skips indels wholly before it
+P19_START_CODON = 54
+
 C_TERM = (205, 213)          # C-terminal tail of pVHL213
 VHL_PROTEIN_LENGTH = 213     # AA length of canonical pVHL213
 
 
 ######################### cDNA-LEVEL HELPERS ##################################
 
+# Generic cDNA pattern capturing interval and op, compiled once at import
+_CDNA_OP_RE = re.compile(
+    r"c\.(\d+)(?:_(\d+))?"
+    r"(?:(delins|del|dup|ins)|([ACGT]>[ACGT]))?"
+    r"([ACGT]*)?"
+)
+
 
 def parse_cdna_interval_and_op(hgvs):
     """
@@ -41,13 +67,7 @@ def parse_cdna_interval_and_op(hgvs):
             'op': one of ['del', 'dup', 'ins', 'delins', 'sub', None]
             'op_seq': optional inserted sequence string (for dup/ins/delins)
     """
-    # Generic cDNA pattern capturing interval and op
-    m = re.search(
-        r"c\.(\d+)(?:_(\d+))?"
-        r"(?:(delins|del|dup|ins)|([ACGT]>[ACGT]))?"
-        r"([ACGT]*)?",
-        hgvs
-    )
+    m = _CDNA_OP_RE.search(hgvs)
     if not m:
         return {"start": None, "end": None, "op": None, "op_seq": None}
 
@@ -77,7 +97,7 @@ def in_critical_domain(codon):
     """
     True if codon lies within any of the VHL critical domains (AA 63–204).
     """
-    return any(start <= codon <= end for start, end in CRITICAL_DOMAINS)
+    return _CRITICAL_START <= codon <= _CRITICAL_END
 
 
 def entirely_before_54(start_aa, end_aa):
@@ -88,7 +108,7 @@ def entirely_before_54(start_aa, end_aa):
     """
     if start_aa is None or end_aa is None:
         return False
-    return end_aa < 54
+    return end_aa < P19_START_CODON
 
 
 def is_exon_boundary(cdna_start, cdna_end):
@@ -168,12 +188,59 @@ def affects_beta_alpha_domains(start_aa, end_aa):
     """
     if start_aa is None or end_aa is None:
         return False
-    dom_start, dom_end = 63, 204
-    return not (end_aa < dom_start or start_aa > dom_end)
+    return not (end_aa < _CRITICAL_START or start_aa > _CRITICAL_END)
 
 
 ############################# PM4 CLASSIFIER ##################################
 
+# PM4 outcomes shared by the scalar and batch classifiers: code -> (strength, context)
+_PM4_OUTCOMES = {
+    "NO_PARSE": (None, "Unable to parse cDNA interval; PM4 not applied for VHL."),
+    "NOT_INFRAME": (
+        None,
+        "Variant is not an in-frame indel at the cDNA level; VHL PM4 not applied.",
+    ),
+    "NO_CODON": (
+        None,
+        "Unable to map cDNA interval to codons; PM4 not applied for VHL.",
+    ),
+    "BEFORE_54": (
+        None,
+        "In-frame change entirely prior to codon 54 and not affecting Met54 or beyond; VHL PM4 not applied.",
+    ),
+    "DOMAIN": (
+        "PM4",
+        "In-frame insertion/deletion within VHL beta/alpha domains (AA 63–204); assign PM4 (Moderate).",
+    ),
+    "OUTSIDE": (
+        None,
+        "In-frame insertion/deletion outside VHL beta/alpha domains (AA 63–204); VHL PM4 not applied.",
+    ),
+}
+
+
+def _pm4_result(outcome):
+    strength, context = _PM4_OUTCOMES[outcome]
+    return {"strength": strength, "context": context}
+
+
+def _pm4_codon_outcome(cdna_start, cdna_end):
+    """
+    PM4 outcome for an in-frame indel from its parsed cDNA interval: codon
+    mapping, the codon-54 exclusion and the AA 63–204 domain test.
+    """
+    # Inlined cdna_to_codon; position 0 maps to no codon
+    if not cdna_start or not cdna_end:
+        return "NO_CODON"
+    aa_start = (cdna_start - 1) // 3 + 1
+    aa_end = (cdna_end - 1) // 3 + 1
+
+    if entirely_before_54(aa_start, aa_end):
+        return "BEFORE_54"
+    if affects_beta_alpha_domains(aa_start, aa_end):
+        return "DOMAIN"
+    return "OUTSIDE"
+
 
 def classify_vhl_pm4(hgvs_str):
     """
@@ -199,52 +266,67 @@ def classify_vhl_pm4(hgvs_str):
     cdna_end = cdna_info["end"]
 
     if cdna_start is None or cdna_end is None:
-        return {
-            "strength": None,
-            "context": "Unable to parse cDNA interval; PM4 not applied for VHL."
-        }
+        return _pm4_result("NO_PARSE")
 
     # 2) Infer in-frame type from cDNA
     vt = infer_inframe_type_from_cdna(cdna_info)
 
     # Handle stop-loss separately if you later extend this to support p. notation.
     if vt == "other":
-        return {
-            "strength": None,
-            "context": "Variant is not an in-frame indel at the cDNA level; VHL PM4 not applied."
-        }
+        return _pm4_result("NOT_INFRAME")
 
-    # 3) Convert cDNA interval to codon interval
-    aa_start, aa_end = cdna_interval_to_codon_interval(cdna_start, cdna_end)
+    # 3) Map to codons, exclude events fully prior to codon 54, then test the
+    #    B / alpha / second-B domains (AA 63–204)
+    return _pm4_result(_pm4_codon_outcome(cdna_start, cdna_end))
 
-    if aa_start is None or aa_end is None:
-        return {
-            "strength": None,
-            "context": "Unable to map cDNA interval to codons; PM4 not applied for VHL."
-        }
 
-    # 4) Exclude events fully prior to codon 54
-    if entirely_before_54(aa_start, aa_end):
-        return {
-            "strength": None,
-            "context": "In-frame change entirely prior to codon 54 and not affecting Met54 or beyond; VHL PM4 not applied."
-        }
-
-    # 5) In-frame indels in B / alpha / second-B domains (AA 63–204)
-    if vt in ["inframe_del", "inframe_ins", "inframe_indel"]:
-        if affects_beta_alpha_domains(aa_start, aa_end):
-            return {
-                "strength": "PM4",
-                "context": "In-frame insertion/deletion within VHL beta/alpha domains (AA 63–204); assign PM4 (Moderate)."
-            }
+# Largest cDNA position the batch path can hold in its int64 arrays
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def classify_vhl_pm4_batch(hgvs_list):
+    """
+    PM4 classifier for a list of HGVS strings; returns one result dict per input.
+
+    Each distinct HGVS is parsed once, then codon mapping and the codon-54 and
+    AA 63–204 domain tests run as vectorized comparisons over every in-frame
+    indel in the batch.
+    """
+    # Parse and type each distinct HGVS once, then scatter back.
+    unique = list(dict.fromkeys(hgvs_list))
+    outcomes = []
+    inframe = []
+    for i, hgvs_full in enumerate(unique):
+        cdna_info = parse_cdna_interval_and_op(hgvs_full)
+        if cdna_info["start"] is None or cdna_info["end"] is None:
+            outcomes.append("NO_PARSE")
+        elif infer_inframe_type_from_cdna(cdna_info) == "other":
+            outcomes.append("NOT_INFRAME")
+        elif max(cdna_info["start"], cdna_info["end"]) > _INT64_MAX:
+            # Too large for the int64 arrays; decide this row in Python.
+            outcomes.append(_pm4_codon_outcome(cdna_info["start"], cdna_info["end"]))
         else:
-            return {
-                "strength": None,
-                "context": "In-frame insertion/deletion outside VHL beta/alpha domains (AA 63–204); VHL PM4 not applied."
-            }
-
-    # Fallback
-    return {
-        "strength": None,
-        "context": "Variant type is not an in-frame indel in AA 63–204; VHL PM4 not applied."
-    }
+            outcomes.append(None)
+            inframe.append((i, cdna_info["start"], cdna_info["end"]))
+
+    if inframe:
+        rows, starts, ends = (
+            np.array(col, dtype=np.int64) for col in zip(*inframe)
+        )
+        aa_start = (starts - 1) // 3 + 1
+        aa_end = (ends - 1) // 3 + 1
+        # Same checks, in the same order, as _pm4_codon_outcome.
+        labels = np.select(
+            [
+                (starts == 0) | (ends == 0),
+                aa_end < P19_START_CODON,
+                (aa_end < _CRITICAL_START) | (aa_start > _CRITICAL_END),
+            ],
+            ["NO_CODON", "BEFORE_54", "OUTSIDE"],
+            default="DOMAIN",
+        )
+        for i, label in zip(rows.tolist(), labels.tolist()):
+            outcomes[i] = label
+
+    results = dict(zip(unique, outcomes))
+    return [_pm4_result(results[hgvs_full]) for hgvs_full in hgvs_list]
@@ -1,4 +1,27 @@
 import re
+from bisect import bisect_right
+from functools import lru_cache
+
+# Missense pattern, compiled once at import; other type tests are substrings
+_MISSENSE_RE = re.compile(r'\(p\.[A-Za-z]{3}\d+[A-Za-z]{3}\)')
+
+# Panel gene definitions by phenotype/group
+VHL2C_PHEO_PANEL = frozenset({"MAX", "NF1", "RET", "SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2", "TMEM127", "VHL"})
+RCC_PHEO_PANEL = frozenset({"MAX", "FH", "SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2", "TMEM127"})
+SDHX = frozenset({"SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2"})
+
+# Point thresholds and the (strength, context) each band maps to, lowest first
+_PS2_THRESHOLDS = (0.5, 1, 2, 4)
+_PS2_STRENGTHS = (
+    (None, "Score did not reach a PS2 evidence threshold for VHL."),
+    ("PS2_Supporting", "PS2_Supporting assigned: Consistent or nonspecific phenotype with incomplete or absent panel testing (0.5 points)."),
+    ("PS2_Moderate", "PS2_Moderate assigned: Consistent phenotype and comprehensive negative panel testing (1 point)."),
+    ("PS2", "PS2 ('Strong', 2 points) based on highly specific phenotype and confirmed de novo status."),
+    ("PS2_VeryStrong", "Multiple probands needed to reach 'Very Strong' (≥4 points)—never assigned to single proband according to ACMG/ClinGen SVI guidelines."),
+)
+
+# All panel genes offered in the app (not directly used in scoring), in UI order
+STREAMLIT_GENES = ("SDHB", "SDHC", "SDHD", "RET", "MAX", "FH", "TMEM127", "NF1", "SDHA", "SDHAF2", "VHL")
 
 def classify_vhl_ps2(
     hgvs_str,
@@ -10,24 +33,26 @@ def classify_vhl_ps2(
     """
     Classifies PS2 (VHL: de novo) for variant per ACMG VCEP and VHL-specific rules.
     """
+    # Only the genes marked "neg" affect scoring, so the panel is reduced to a
+    # hashable frozenset (None when no panel results were given).
+    neg_genes = (
+        frozenset(gene for gene, result in panel_neg.items() if result == "neg")
+        if panel_neg
+        else None
+    )
+    return dict(
+        _classify_vhl_ps2_cached(
+            hgvs_str, bool(is_de_novo), phenotype, neg_genes, bool(family_history)
+        )
+    )
 
-    # Panel gene definitions by phenotype/group
-    VHL2C_PHEO_PANEL = {"MAX", "NF1", "RET", "SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2", "TMEM127", "VHL"}
-    RCC_PHEO_PANEL = {"MAX", "FH", "SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2", "TMEM127"}
-    SDHX = {"SDHA", "SDHB", "SDHC", "SDHD", "SDHAF2"}
-
-    # All panel genes offered in the app (not directly used in scoring)
-    STREAMLIT_GENES = ["SDHB", "SDHC", "SDHD", "RET", "MAX", "FH", "TMEM127", "NF1", "SDHA", "SDHAF2", "VHL"]
 
-    # Variant type recognition
-    is_missense = re.search(r'\(p\.[A-Za-z]{3}\d+[A-Za-z]{3}\)', hgvs_str) is not None
-    is_nonsense = "Ter" in hgvs_str or "*" in hgvs_str or "stop" in hgvs_str
-    is_frameshift = "fs" in hgvs_str
-    is_splice = "+" in hgvs_str or "-" in hgvs_str or re.search(r'splice', hgvs_str)
-    is_inframe_indel = (
-        ("del" in hgvs_str and not "fs" in hgvs_str) or
-        ("dup" in hgvs_str and not "fs" in hgvs_str)
-    )
+@lru_cache(maxsize=4096)
+def _classify_vhl_ps2_cached(hgvs_str, is_de_novo, phenotype, neg_genes, family_history):
+    """
+    Memoized PS2 decision; classify_vhl_ps2 hands callers a copy, so the cached
+    dict is never mutated.
+    """
 
     # Eligibility checks
     if not is_de_novo:
@@ -40,6 +65,14 @@ def classify_vhl_ps2(
             "strength": None,
             "context": "PS2 cannot be scored if there is any family history of VHL disease."
         }
+
+    # Variant type recognition, only once origin and family history allow PS2
+    is_missense = _MISSENSE_RE.search(hgvs_str) is not None
+    is_nonsense = "Ter" in hgvs_str or "*" in hgvs_str or "stop" in hgvs_str
+    is_frameshift = "fs" in hgvs_str
+    is_splice = "+" in hgvs_str or "-" in hgvs_str or "splice" in hgvs_str
+    is_inframe_indel = ("del" in hgvs_str or "dup" in hgvs_str) and not is_frameshift
+
     if not (is_missense or is_nonsense or is_frameshift or is_splice or is_inframe_indel):
         return {
             "strength": None,
@@ -50,11 +83,11 @@ def classify_vhl_ps2(
     context_lines = []
 
     # Collate negative-tested genes, if provided by user
-    if panel_neg:
-        neg_list = [gene for gene, result in panel_neg.items() if result == "neg"]
-        neg_panel_str = f"Panel genes marked negative: {', '.join(sorted(neg_list))}."
+    if neg_genes is not None:
+        neg_set = neg_genes
+        neg_panel_str = f"Panel genes marked negative: {', '.join(sorted(neg_set))}."
     else:
-        neg_list = []
+        neg_set = frozenset()
         neg_panel_str = "Panel testing results not provided."
 
     # Highly specific phenotype (e.g., Danish criteria)
@@ -73,9 +106,9 @@ def classify_vhl_ps2(
 
     elif phenotype == "consistent":
         # Panel completeness checks
-        missing_pheo = [gene for gene in VHL2C_PHEO_PANEL if gene not in neg_list]
-        missing_rcc_pheo = [gene for gene in RCC_PHEO_PANEL if gene not in neg_list]
-        panel_tested = bool(panel_neg)
+        missing_pheo = sorted(VHL2C_PHEO_PANEL - neg_set)
+        missing_rcc_pheo = sorted(RCC_PHEO_PANEL - neg_set)
+        panel_tested = neg_genes is not None
         
         if panel_tested and not missing_pheo:
             score = 1
@@ -135,33 +168,33 @@ def classify_vhl_ps2(
         )
 
     # SVI-guided label logic (VCEP/ClinGen rules)
-    if score >= 4:
-        strength = "PS2_VeryStrong"
-        context_lines.append(
-            "Multiple probands needed to reach 'Very Strong' (≥4 points)—never assigned to single proband according to ACMG/ClinGen SVI guidelines."
-        )
-    elif score >= 2:
-        strength = "PS2"
-        context_lines.append(
-            "PS2 ('Strong', 2 points) based on highly specific phenotype and confirmed de novo status."
-        )
-    elif score >= 1:
-        strength = "PS2_Moderate"
-        context_lines.append(
-            "PS2_Moderate assigned: Consistent phenotype and comprehensive negative panel testing (1 point)."
-        )
-    elif score >= 0.5:
-        strength = "PS2_Supporting"
-        context_lines.append(
-            "PS2_Supporting assigned: Consistent or nonspecific phenotype with incomplete or absent panel testing (0.5 points)."
-        )
-    else:
-        strength = None
-        context_lines.append(
-            "Score did not reach a PS2 evidence threshold for VHL."
-        )
+    strength, strength_line = _PS2_STRENGTHS[bisect_right(_PS2_THRESHOLDS, score)]
+    context_lines.append(strength_line)
 
     return {
         "strength": strength,
         "context": " ".join(context_lines) + f" (Score: {score})"
-    }
\ No newline at end of file
+    }
+
+def classify_vhl_ps2_batch(
+    hgvs_list,
+    is_de_novo=False,
+    phenotype=None,
+    panel_neg=None,
+    family_history=False
+):
+    """
+    PS2 classifier for a list of HGVS strings sharing one proband's origin,
+    phenotype and panel results; returns one result dict per input.
+
+    Each distinct HGVS is scored once through the memoized classifier, then
+    copies are scattered back to every row.
+    """
+    unique = list(dict.fromkeys(hgvs_list))
+    results = {
+        hgvs_str: classify_vhl_ps2(
+            hgvs_str, is_de_novo, phenotype, panel_neg, family_history
+        )
+        for hgvs_str in unique
+    }
+    return [dict(results[hgvs_str]) for hgvs_str in hgvs_list]
@@ -1,11 +1,15 @@
 import re
-
-# Exon boundaries for NM_000551.4 (VHL); adjust as needed
-VHL_EXON_BOUNDS = [
-    (1, 340),    # Exon 1: c.1 - c.340
-    (341, 463),  # Exon 2: c.341 - c.463
-    (464, 642)   # Exon 3: c.464 - c.642
-]
+from functools import lru_cache
+
+# Exon bounds and the codon/exon helpers are identical to PM4's; share them
+# rather than keeping a second copy that can drift. cdna_to_codon stays in
+# this namespace for external callers; the classifier inlines its arithmetic.
+from vhl_pm4 import (
+    VHL_EXON_BOUNDS,
+    _contiguous_span,
+    cdna_to_codon,
+    is_exon_boundary,
+)
 
 CRITICAL_DOMAINS = [
     (63, 154),    # 1st Beta domain – Nuclear Export 114-155
@@ -13,24 +17,29 @@ CRITICAL_DOMAINS = [
     (193, 204)    # 2nd Beta domain
 ]
 C_TERM = (205, 213)
+_CRITICAL_START, _CRITICAL_END = _contiguous_span(CRITICAL_DOMAINS)
+
+# HGVS patterns used on every classification, compiled once at import.
+# Fixed keywords (del, dup, fs, ins, Met1, ...) are plain substring tests.
+_CDNA_RANGE_RE = re.compile(r"c\.(\d+)(?:_(\d+))?")
+_CANONICAL_SPLICE_RE = re.compile(r"c\.(\d+)(\+1|\+2|\-1|\-2)")
+_CRYPTIC_SPLICE_RE = re.compile(r"c\.(\d+)(\+\d+|\-\d+)")
+_SUB_RE = re.compile(r"[ATGC]>")
 
 def parse_cdna(hgvs):
-    m = re.search(r"c\.(\d+)(?:_(\d+))?", hgvs)
+    """
+    Return the (start, end) cDNA positions of a c.HGVS string; a single
+    position gives start == end, and an unparseable string (None, None).
+    """
+    m = _CDNA_RANGE_RE.search(hgvs)
     if m:
         start = int(m.group(1))
         end = int(m.group(2)) if m.group(2) else start
         return start, end
-    m_single = re.search(r"c\.(\d+)", hgvs)
-    if m_single:
-        pos = int(m_single.group(1))
-        return pos, pos
     return None, None
 
-def cdna_to_codon(cdna_pos):
-    return ((cdna_pos - 1) // 3) + 1 if cdna_pos else None
-
 def in_critical_domain(codon):
-    return any(start <= codon <= end for start, end in CRITICAL_DOMAINS)
+    return _CRITICAL_START <= codon <= _CRITICAL_END
 
 def in_cterm(codon):
     return codon is not None and 205 <= codon <= 213
@@ -38,13 +47,6 @@ def in_cterm(codon):
 def predict_nmd(codon):
     return codon is not None and 55 <= codon <= 136
 
-def is_exon_boundary(cdna_start, cdna_end):
-    """Returns True if the interval OR region completely covers any known exon boundary (full exon is deleted)."""
-    for exon_start, exon_end in VHL_EXON_BOUNDS:
-        if cdna_start <= exon_start and cdna_end >= exon_end:
-            return True
-    return False
-
 
 ############################# PVS1 ###################################################
 def classify_vhl_pvs1(
@@ -55,10 +57,27 @@ def classify_vhl_pvs1(
     duplication_type=None, # "tandem", "not_in_tandem", None
     initiation_codon=None
 ):
-    # Type parsing and position
+    # All arguments are hashable, so repeat calls are served from the cache;
+    # callers get a copy and can never mutate the cached dict.
+    return dict(_classify_vhl_pvs1_cached(
+        hgvs_str, exon_skipping, cryptic_disrupts_rf, cryptic_preserves_rf,
+        duplication_type, initiation_codon
+    ))
+
+
+@lru_cache(maxsize=4096)
+def _classify_vhl_pvs1_cached(
+    hgvs_str,
+    exon_skipping,
+    cryptic_disrupts_rf,
+    cryptic_preserves_rf,
+    duplication_type,
+    initiation_codon
+):
+    # Type parsing and position (cdna_to_codon arithmetic inlined)
     cdna_start, cdna_end = parse_cdna(hgvs_str)
-    codon_start = cdna_to_codon(cdna_start) if cdna_start else None
-    codon_end   = cdna_to_codon(cdna_end) if cdna_end else codon_start
+    codon_start = (cdna_start - 1) // 3 + 1 if cdna_start else None
+    codon_end   = (cdna_end - 1) // 3 + 1 if cdna_end else codon_start
     min_codon = min(codon_start, codon_end) if codon_start and codon_end else None
 
     critical_domain = in_critical_domain(min_codon) if min_codon else False
@@ -66,8 +85,8 @@ def classify_vhl_pvs1(
     nmd = predict_nmd(min_codon)
 
     vt = None
-    canonical = re.search(r"c\.(\d+)(\+1|\+2|\-1|\-2)", hgvs_str)
-    cryptic   = re.search(r"c\.(\d+)(\+\d+|\-\d+)", hgvs_str)
+    canonical = _CANONICAL_SPLICE_RE.search(hgvs_str)
+    cryptic   = _CRYPTIC_SPLICE_RE.search(hgvs_str)
 
     # Canonical GT-AG splice or exon-skipping assigned Very Strong
     if canonical or exon_skipping:
@@ -80,14 +99,14 @@ def classify_vhl_pvs1(
             vt = "cryptic_splice"
 
     # Explicit exon deletion (whole-exon, not detected as small indel)
-    elif re.search(r"(del)", hgvs_str):
+    elif "del" in hgvs_str:
         if cdna_start is not None and cdna_end is not None and is_exon_boundary(cdna_start, cdna_end):
             vt = "exon_deletion"
         else:
             size = (cdna_end - cdna_start + 1) if (cdna_start and cdna_end) else 1
             vt = "frameshift" if size % 3 != 0 else "inframe_del"
 
-    elif re.search(r"(dup)", hgvs_str):
+    elif "dup" in hgvs_str:
         size = (cdna_end - cdna_start + 1) if (cdna_start and cdna_end) else 1
         # Duplication logic: must be >=1 exon and completely within gene
         if duplication_type == "tandem":
@@ -96,9 +115,9 @@ def classify_vhl_pvs1(
             vt = "duplication_not_in_tandem"
         else:
             vt = "duplication_unknown"
-    elif re.search(r"(fs)", hgvs_str) or re.search(r"(ins)", hgvs_str):
+    elif "fs" in hgvs_str or "ins" in hgvs_str:
         vt = "frameshift"
-    elif re.search(r"([A,T,G,C]>)", hgvs_str):
+    elif _SUB_RE.search(hgvs_str):
         if "*" in hgvs_str or "Ter" in hgvs_str or "stop" in hgvs_str:
             vt = "nonsense"
         else:
@@ -106,9 +125,9 @@ def classify_vhl_pvs1(
 
     # Initiation codon logic
     if initiation_codon is None:
-        if re.search(r"(Met1|M1)", hgvs_str):
+        if "Met1" in hgvs_str or "M1" in hgvs_str:
             initiation_codon = "Met1"
-        elif re.search(r"(Met54|M54)", hgvs_str):
+        elif "Met54" in hgvs_str or "M54" in hgvs_str:
             initiation_codon = "Met54"
 
     # EARLY truncation logic: exclude any variant that starts before codon 54
@@ -180,7 +199,7 @@ def classify_vhl_pvs1(
     # Missense or synonymous – not LoF
     if vt == "missense":
         return {"strength": None, "context": "Missense variant—VHL PVS1 applies only to loss-of-function variants."}
-    if re.search(r"(synonymous|silent)", hgvs_str):
+    if "synonymous" in hgvs_str or "silent" in hgvs_str:
         return {"strength": None, "context": "Synonymous (silent) change; does not affect protein function—VHL PVS1 not scored."}
 
     # Fallback
@@ -192,4 +211,18 @@ def classify_vhl_pvs1(
     if not details:
         details.append("Variant does not match any pathogenic loss-of-function mechanism scored by VHL PVS1 decision tree.")
     context = "; ".join(details)
-    return {"strength": None, "context": context}
\ No newline at end of file
+    return {"strength": None, "context": context}
+
+
+def classify_vhl_pvs1_batch(hgvs_list, **kwargs):
+    """
+    PVS1 classifier for a list of HGVS strings sharing the same curator inputs
+    (exon skipping, cryptic splice, duplication and initiation-codon flags);
+    returns one result dict per input.
+
+    Each distinct HGVS is scored once through the memoized classifier, then
+    copies are scattered back to every row.
+    """
+    unique = list(dict.fromkeys(hgvs_list))
+    results = {hgvs_str: classify_vhl_pvs1(hgvs_str, **kwargs) for hgvs_str in unique}
+    return [dict(results[hgvs_str]) for hgvs_str in hgvs_list]